@@ -1,10 +1,22 @@
+import os
+import sys
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
-from bot import answer
+from bot import answer, start_price_refresher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fetch prices at startup and keep them fresh in the background.
+    start_price_refresher()
+    yield
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "https://fabrico.ae",
@@ -41,3 +53,18 @@ def jabir_chat(req: ChatRequest):
 
     reply = answer(user_text)
     return ChatResponse(reply=reply)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # One worker keeps a single warm copy of the bot's in-process caches.
+    # uvloop has no Windows build, so let uvicorn pick the loop there.
+    uvicorn.run(
+        "app:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        loop="auto" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=1,
+    )
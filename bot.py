@@ -1,19 +1,204 @@
+import difflib
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 PRICING_API_URL = "https://doobi.ae/packages"
+PRICING_API_TIMEOUT = (2, 4)  # (connect, read) seconds
+PRICE_CACHE_FILE = os.getenv("JABIR_PRICE_CACHE")  # default: ~/.cache/jabir/prices.json
+
+# Shared session: keeps the TLS connection to the pricing API alive between
+# refreshes and retries transient gateway errors.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=4,
+        max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+    ),
+)
+
+# Returned by the cached FAQ pass when the reply needs the live price list.
+_PRICE_QUERY = object()
+
+# Longer messages skip the reply cache so it can't pin large strings in memory.
+_CACHE_MAX_CHARS = 256
+
+_PRICE_TTL = 300  # seconds
+_PRICE_REFRESH = 240  # background refresh interval; below the TTL so the cache never lapses
+_PRICE_CACHE = {"ts": 0.0, "attempt": 0.0, "data": None, "etag": None, "failures": 0, "open_until": 0.0}
+# After this many failed fetches in a row, stop calling the API for a cool-off period.
+_PRICE_MAX_FAILURES = 3
+_PRICE_COOLOFF = 60  # seconds
+_PRICE_LOCK = threading.Lock()
+_PRICE_INDEX = {"prices": None, "index": None}
+_PRICE_REFRESHER = {"thread": None}
+
+_ARABIC_RE = re.compile("[\u0600-\u06FF]")
+_LANG_SCAN_CHARS = 128
+# Spelling variants folded before matching: hamza/madda alefs to bare alef, alef
+# maqsura to ya, ta marbuta to ha; tashkeel (U+064B-U+0652) and tatweel removed.
+_AR_NORMALIZE = str.maketrans(
+    {"أ": "ا", "إ": "ا", "آ": "ا", "ى": "ي", "ة": "ه", "\u0640": None, **dict.fromkeys(range(0x064B, 0x0653))}
+)
+
+_AR_GREETINGS = frozenset(
+    {
+        "مرحبا",
+        "اهلا",
+        "السلام عليكم",
+        "هلا",
+        "مرحبا جابر",
+        "اهلا جابر",
+    }
+)
+_EN_GREETINGS = frozenset({"hi", "hello", "hey", "salam", "ahlan", "hi jabir", "hello jabir", "hey jabir"})
+
+_AR_GREETING_REPLY = "أهلاً! أنا جابر من مغسلة فريش تاتش. كيف أقدر أساعدك اليوم؟"
+_EN_GREETING_REPLY = "Ahlan! I'm Jabir from Fresh Touch Laundry. How can I assist you today?"
+
+# Exact greetings are a large share of traffic; answer them with one dict lookup,
+# before language detection and small-talk dispatch.
+_PRECANNED = MappingProxyType(
+    {
+        **{g: _AR_GREETING_REPLY for g in _AR_GREETINGS},
+        **{g: _EN_GREETING_REPLY for g in _EN_GREETINGS},
+    }
+)
 
 
 def detect_language(text: str) -> str:
-    """Very simple language detector: Arabic if contains Arabic chars, else English."""
-    if any("\u0600" <= ch <= "\u06FF" for ch in text):
+    """Very simple language detector: Arabic if the first _LANG_SCAN_CHARS chars contain Arabic, else English."""
+    # str.isascii() reads a flag CPython keeps on the string, so English skips the scan.
+    if text.isascii():
+        return "en"
+    if _ARABIC_RE.search(text, 0, _LANG_SCAN_CHARS):
         return "ar"
     return "en"
 
 
+def _normalize_arabic(t: str) -> str:
+    """Fold Arabic spelling variants so one trigger covers "أهلاً", "اهلا", "شكرًا", ..."""
+    return t.translate(_AR_NORMALIZE)
+
+
 def get_prices_from_site():
+    """Prices from the API, cached for _PRICE_TTL seconds. Returns dict: name_lower -> description string."""
+    cached = _PRICE_CACHE["data"]
+    if cached is not None and time.monotonic() - _PRICE_CACHE["ts"] < _PRICE_TTL:
+        return cached
+
+    return _refresh_prices(time.monotonic())
+
+
+def _refresh_prices(started):
+    """Fetch prices into the cache unless a fetch finished after `started`. Returns the cached dict."""
+    # API is down: answer from what we have instead of waiting out another timeout.
+    if started < _PRICE_CACHE["open_until"]:
+        return _PRICE_CACHE["data"]
+
+    with _PRICE_LOCK:
+        # Another thread fetched while we waited for the lock: reuse its result.
+        if _PRICE_CACHE["attempt"] >= started:
+            return _PRICE_CACHE["data"]
+
+        prices = _fetch_prices()
+        now = time.monotonic()
+        _PRICE_CACHE["attempt"] = now
+        if prices is None:
+            _PRICE_CACHE["failures"] += 1
+            if _PRICE_CACHE["failures"] >= _PRICE_MAX_FAILURES:
+                _PRICE_CACHE["failures"] = 0
+                _PRICE_CACHE["open_until"] = now + _PRICE_COOLOFF
+            # Serve the last good list while the API is failing; after a restart
+            # that is the copy saved on disk.
+            if _PRICE_CACHE["data"] is None:
+                _PRICE_CACHE["data"] = _load_saved_prices()
+            return _PRICE_CACHE["data"]
+
+        _PRICE_CACHE["failures"] = 0
+        if prices is not _PRICE_CACHE["data"]:
+            _save_prices(prices)
+        _PRICE_CACHE["data"] = prices
+        _PRICE_CACHE["ts"] = now
+        return prices
+
+
+def start_price_refresher():
+    """Keep the price cache warm from a daemon thread, so price replies never wait on the API."""
+    if _PRICE_REFRESHER["thread"] is not None:
+        return
+
+    def refresh_forever():
+        while True:
+            # Never let one bad refresh end the thread; nothing would restart it.
+            try:
+                _refresh_prices(time.monotonic())
+            except Exception as e:
+                print("⚠️ Background price refresh failed:", e)
+            time.sleep(_PRICE_REFRESH)
+
+    thread = threading.Thread(target=refresh_forever, name="price-refresher", daemon=True)
+    _PRICE_REFRESHER["thread"] = thread
+    thread.start()
+
+
+def _price_cache_file():
+    """Path of the saved price list. Resolved on use: Path.home() raises when there is no home directory."""
+    if PRICE_CACHE_FILE:
+        return Path(PRICE_CACHE_FILE)
+    return Path.home() / ".cache" / "jabir" / "prices.json"
+
+
+def _load_saved_prices():
+    """Last price list written by _save_prices, or None."""
+    try:
+        with open(_price_cache_file(), encoding="utf-8") as f:
+            prices = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print("⚠️ Could not read saved prices:", e)
+        return None
+
+    if not isinstance(prices, dict) or not prices:
+        return None
+    return prices
+
+
+def _save_prices(prices):
+    """Persist the price list so a restart during an API outage still has prices."""
+    try:
+        path = _price_cache_file()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(prices, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except Exception as e:
+        print("⚠️ Could not save prices:", e)
+
+
+def _fetch_prices():
     """Fetch and normalize prices from API. Returns dict: name_lower -> description string."""
+    # Revalidate with the last ETag; an unchanged list comes back as a bodiless 304.
+    etag = _PRICE_CACHE["etag"] if _PRICE_CACHE["data"] is not None else None
+    headers = {"If-None-Match": etag} if etag else None
     try:
-        resp = requests.get(PRICING_API_URL, timeout=10)
+        resp = _SESSION.get(PRICING_API_URL, headers=headers, timeout=PRICING_API_TIMEOUT)
+        if resp.status_code == 304 and etag:
+            return _PRICE_CACHE["data"]
         resp.raise_for_status()
     except Exception as e:
         print("⚠️ Could not fetch prices from API:", e)
@@ -25,6 +210,10 @@ def get_prices_from_site():
         print("⚠️ API did not return valid JSON:", e)
         return None
 
+    if not isinstance(data, dict):
+        print("⚠️ API response is not a JSON object.")
+        return None
+
     packages = data.get("packages", [])
     if not isinstance(packages, list):
         print("⚠️ 'packages' is not a list in API response.")
@@ -32,6 +221,8 @@ def get_prices_from_site():
 
     prices = {}
     for pkg in packages:
+        if not isinstance(pkg, dict):
+            continue
         name = str(pkg.get("name", "")).strip()
         if not name:
             continue
@@ -62,55 +253,26 @@ def get_prices_from_site():
         print("⚠️ No prices parsed from API.")
         return None
 
+    _PRICE_CACHE["etag"] = resp.headers.get("ETag")
     return prices
 
 
-def handle_small_talk_and_meta(text: str, lang: str):
-    """Greetings, thanks, compliments, identity questions."""
-    t = text.strip().lower()
-
-    if lang == "ar":
-        arabic_greetings = [
-            "مرحبا",
-            "أهلا",
-            "اهلا",
-            "السلام عليكم",
-            "هلا",
-            "مرحبا جابر",
-            "اهلا جابر",
-        ]
-        if t in arabic_greetings:
-            return "أهلاً! أنا جابر من مغسلة فريش تاتش. كيف أقدر أساعدك اليوم؟"
-
-        if any(p in t for p in ["شكرا", "شكرًا", "مشكور", "يعطيك العافية"]):
-            return "العفو 🌸، إذا تحتاج أي مساعدة في الغسيل أو الأسعار أو الاستلام والتوصيل أنا حاضر."
-
-        if any(p in t for p in ["انت رائع", "أنت رائع", "انت لطيف", "أنت لطيف", "كويس", "حلو", "جيد"]):
-            return "تسلم 🧡، شكراً على الكلام الطيب. كيف أقدر أساعدك في الغسيل أو الأسعار؟"
-
-        if any(p in t for p in ["اسمك", "مين انت", "من انت", "هل انت روبوت", "هل انت انسان"]):
-            return (
-                "أنا جابر، المساعد الافتراضي لمغسلة فريش تاتش للغسيل والتنظيف الجاف. "
-                "أقدر أساعدك في الأسعار، الخدمات، العروض، وحجز استلام الغسيل من البيت."
-            )
-
-        if any(p in t for p in ["ماذا تستطيع", "شو تسوي", "كيف تساعدني", "ايش تسوي", "ماذا تفعل"]):
-            return (
-                "أقدر أساعدك في معرفة أسعار الغسيل والتنظيف الجاف، وخدمات مثل البخور، "
-                "غسيل بالصندل وروائح الورد والياسمين، وأشرح لك طريقة حجز طلب سريع من خلال موقع fabrico.ae."
-            )
-
-    # English small talk
-    greetings = ["hi", "hello", "hey", "salam", "ahlan", "hi jabir", "hello jabir", "hey jabir"]
-    if t in greetings:
-        return "Ahlan! I'm Jabir from Fresh Touch Laundry. How can I assist you today?"
+def _compile_phrases(phrases):
+    """Compile literal phrases into one alternation; `.search(t)` matches iff `any(p in t ...)`."""
+    return re.compile("|".join(map(re.escape, phrases)))
 
-    if any(p in t for p in ["thanks", "thank you", "thx", "tnx"]):
-        return "You’re most welcome! 😊 If you need help with laundry, prices, pickup or offers, just ask me."
 
-    if any(
-        p in t
-        for p in [
+# Small-talk trigger phrases per language.
+_SMALL_TALK_TRIGGERS = {
+    "ar": {
+        "thanks": ["شكرا", "مشكور", "يعطيك العافية"],
+        "compliment": ["انت رائع", "انت لطيف", "كويس", "حلو", "جيد"],
+        "identity": ["اسمك", "مين انت", "من انت", "هل انت روبوت", "هل انت انسان"],
+        "capabilities": ["ماذا تستطيع", "شو تسوي", "كيف تساعدني", "ايش تسوي", "ماذا تفعل"],
+    },
+    "en": {
+        "thanks": ["thanks", "thank you", "thx", "tnx"],
+        "compliment": [
             "you are nice",
             "you're nice",
             "you are cool",
@@ -121,268 +283,125 @@ def handle_small_talk_and_meta(text: str, lang: str):
             "you're good",
             "love you",
             "i like you",
-        ]
-    ):
-        return "Thank you, that’s very kind of you 🧡 I’m here anytime you need help with laundry, prices, pickup or offers."
-
-    if any(p in t for p in ["your name", "who are you", "what are you", "are you a bot", "are you human"]):
-        return (
+        ],
+        "identity": ["your name", "who are you", "what are you", "are you a bot", "are you human"],
+        "capabilities": ["what can you do", "how can you help", "what do you do"],
+    },
+}
+
+# Compiled once at import, in the same normalized form as the Arabic input.
+_SMALL_TALK_PATTERNS = {
+    lang: {intent: _compile_phrases(map(_normalize_arabic, phrases)) for intent, phrases in triggers.items()}
+    for lang, triggers in _SMALL_TALK_TRIGGERS.items()
+}
+
+
+_SMALL_TALK_REPLIES = {
+    "ar": {
+        "thanks": "العفو 🌸، إذا تحتاج أي مساعدة في الغسيل أو الأسعار أو الاستلام والتوصيل أنا حاضر.",
+        "compliment": "تسلم 🧡، شكراً على الكلام الطيب. كيف أقدر أساعدك في الغسيل أو الأسعار؟",
+        "identity": (
+            "أنا جابر، المساعد الافتراضي لمغسلة فريش تاتش للغسيل والتنظيف الجاف. "
+            "أقدر أساعدك في الأسعار، الخدمات، العروض، وحجز استلام الغسيل من البيت."
+        ),
+        "capabilities": (
+            "أقدر أساعدك في معرفة أسعار الغسيل والتنظيف الجاف، وخدمات مثل البخور، "
+            "غسيل بالصندل وروائح الورد والياسمين، وأشرح لك طريقة حجز طلب سريع من خلال موقع fabrico.ae."
+        ),
+    },
+    "en": {
+        "thanks": "You’re most welcome! 😊 If you need help with laundry, prices, pickup or offers, just ask me.",
+        "compliment": (
+            "Thank you, that’s very kind of you 🧡 "
+            "I’m here anytime you need help with laundry, prices, pickup or offers."
+        ),
+        "identity": (
             "I’m Jabir, the virtual assistant for Fresh Touch Laundry & Dry Cleaning. "
             "I’m here to help with prices, services, offers and booking your laundry pickup."
-        )
-
-    if any(p in t for p in ["what can you do", "how can you help", "what do you do"]):
-        return (
+        ),
+        "capabilities": (
             "I can help you with laundry prices, services, special washes like bakhoor steam, "
             "sandalwood, rose and jasmine, and explain how to place a quick order on fabrico.ae."
-        )
-
-    return None
+        ),
+    },
+}
 
 
-def faq_answer(text: str, lang: str):
-    """Main FAQ / business logic, bilingual."""
+def handle_small_talk_and_meta(text: str, lang: str):
+    """Greetings, thanks, compliments, identity questions."""
     t = text.strip().lower()
+    return _match_small_talk(_normalize_arabic(t) if lang == "ar" else t, lang)
+
 
-    # Complaints: "not answering", "very slow"
+def _match_small_talk(t: str, lang: str):
+    """Small-talk matching on text already normalized by the caller (see _match_message)."""
     if lang == "ar":
-        if any(p in t for p in ["ما تجاوب", "ما ترد", "بطيء", "بطيئ", "بطئ"]):
-            return (
-                "آسف إذا حسّيت أني ما جاوبتك صح أو أن الرد كان بطيء.\n"
-                "حاول تكتب سؤالك مرة ثانية عن الغسيل أو الأسعار أو التوصيل، وأنا أجاوبك بأوضح شكل ممكن. 🌸"
-            )
-    else:
-        if any(p in t for p in ["not answering", "not ansering", "answer my question", "very slow", "too slow"]):
-            return (
-                "Sorry if it felt like I wasn’t answering you properly or was a bit slow.\n"
-                "Please ask again about laundry, prices, pickup or offers and I’ll try to answer more clearly. 😊"
-            )
-
-    # Common items for price detection
-    common_items = [
-        "abaya",
-        "shela",
-        "sheila",
-        "jalabiya",
-        "kandoora",
-        "kandura",
-        "thobe",
-        "dress",
-        "blanket",
-        "duvet",
-        "curtain",
-        "curtains",
-        "carpet",
-        "t-shirt",
-        "shirt",
-        "trouser",
-        "pants",
-        "jeans",
-        "bedsheet",
-        "bed sheet",
-        "bedcover",
-        "bed cover",
-        "apron",
-        "cap",
-        "lungi",
-        "wizar",
-        "wizaar",
-    ]
+        if t in _AR_GREETINGS:
+            return _AR_GREETING_REPLY
 
-    # If user wrote just "abaya" → treat as price query
-    if t in common_items:
-        t = "price " + t
+        for intent, pattern in _SMALL_TALK_PATTERNS["ar"].items():
+            if pattern.search(t):
+                return _SMALL_TALK_REPLIES["ar"][intent]
 
-    # ========== Arabic branch ==========
-    if lang == "ar":
-        # ✅ VIEW ORDER / TRACK ORDER
-        if any(
-            p in t
-            for p in [
-                "اشوف طلبي",
-                "أشوف طلبي",
-                "اشوف الطلب",
-                "أشوف الطلب",
-                "طلباتي",
-                "طلباتى",
-                "اتابع طلبي",
-                "أتتبع طلبي",
-                "تتبع الطلب",
-                "حالة الطلب",
-            ]
-        ):
-            return (
-                "عشان تشوف طلبك وتتابع حالته:\n\n"
-                "1. افتح موقع fabrico.ae\n"
-                "2. اضغط على «تسجيل الدخول برمز OTP»\n"
-                "3. حط رقم جوالك، وادخل رمز التحقق اللي يوصلك برسالة SMS\n"
-                "4. بعد تسجيل الدخول، ادخل على قائمة «طلباتي» My Orders\n"
-                "5. اختر الطلب اللي تبيه\n\n"
-                "بتشوف هناك:\n"
-                "- حالة الطلب خطوة بخطوة\n"
-                "- وقت الاستلام والتسليم المتوقع\n"
-                "- حالة الدفع (مدفوع / غير مدفوع)\n"
-                "- تفاصيل المبلغ والملابس.\n"
-            )
-
-        # ✅ PAYMENT / HOW TO PAY
-        if any(
-            p in t
-            for p in [
-                "كيف ادفع",
-                "كيف أدفع",
-                "طريقة الدفع",
-                "الدفع",
-                "ادفع",
-                "أدفع",
-                "سداد",
-                "فاتورة",
-                "الفاتورة",
-                "اسدد",
-            ]
-        ):
-            return (
-                "عشان تدفع فاتورة الغسيل أونلاين:\n\n"
-                "1. افتح موقع fabrico.ae\n"
-                "2. سجّل دخول برقم جوالك باستخدام «تسجيل الدخول برمز OTP»\n"
-                "3. ادخل على قسم «طلباتي» My Orders\n"
-                "4. اختر الطلب اللي عليه مبلغ مستحق\n"
-                "5. اضغط زر «الدفع» Pay\n"
-                "6. اختر طريقة الدفع المناسبة:\n"
-                "   - بطاقة بنكية (Debit / Credit Card)\n"
-                "   - Apple Pay\n"
-                "   - Google Pay\n"
-                "7. بعد الدفع، تقدر تشوف تأكيد الدفع وتحمل الفاتورة.\n\n"
-                "لو واجهتك أي مشكلة في الدفع، تقدر تتواصل معنا على الواتساب 056 211 1334. 😊"
-            )
-
-        # ✅ OTP LOGIN / ACCOUNT / TRACK (generic)
-        if any(
-            p in t
-            for p in [
-                "تسجيل الدخول",
-                "تسجيل دخول",
-                "كيف ادخل",
-                "كيف أسجل",
-                "الدخول",
-                "otp",
-                "رمز",
-                "رمز تحقق",
-                "رمز التحقق",
-                "دخول بالحساب",
-                "حسابي",
-            ]
-        ):
-            return (
-                "طريقة تسجيل الدخول باستخدام رمز OTP سهلة جداً!\n\n"
-                "1. افتح موقع fabrico.ae\n"
-                "2. اضغط على خيار «تسجيل الدخول برمز OTP»\n"
-                "3. اكتب رقم جوالك\n"
-                "4. بيصلك رمز تحقق مكوّن من 6 أرقام في رسالة SMS\n"
-                "5. أدخل الرمز وبيتم تسجيل دخولك فوراً\n\n"
-                "بعدها تقدر:\n"
-                "- تشوف كل طلباتك السابقة والجديدة\n"
-                "- تتابع حالة الطلب خطوة بخطوة\n"
-                "- تعرف حالة الدفع\n"
-                "- تدفع بالبطاقة أو Apple Pay أو Google Pay\n"
-                "- تحمّل الفاتورة والإيصال\n\n"
-                "ما تحتاج كلمة سر — فقط رمز OTP السريع. 😊"
-            )
-
-        # Services
-        if any(p in t for p in ["ما هي خدماتكم", "ايش الخدمات", "شو الخدمات", "ما الخدمات", "وش تقدمون"]):
-            return (
-                "نقدم غسيل، تنظيف جاف، كي، عبايات، كنادير، فساتين، بدلات، ملابس أطفال، "
-                "ستائر، سجاد، لحف، بطانيات، مناشف ومفارش سرير وأكثر.\n"
-                "تقدر تحجز طلب سريع عن طريق موقع fabrico.ae، ومندوبنا يتواصل معك قبل الاستلام للتأكيد."
-            )
-
-        # Offers / discount
-        if any(p in t for p in ["عرض", "العرض", "العروض", "خصم", "تخفيض"]):
-            return (
-                "حالياً نقدم خصم 20% على أول 3 طلبات في الشهر (حسب توفر العرض).\n"
-                "الخصم يطبق على قيمة الغسيل عند الدفع، سواء بالبطاقة أو Apple Pay أو Google Pay."
-            )
-
-        # WhatsApp / contact
-        if any(p in t for p in ["واتساب", "الواتساب", "رقمك", "رقمكم", "رقم الهاتف", "رقم الجوال", "اتصال"]):
-            return "تقدر تتواصل معنا على الواتساب أو الاتصال على: 📞 056 211 1334"
-
-        # Area coverage
-        if any(p in t for p in ["منطقتي", "في منطقتي", "تخدمون منطقتي", "تخدمون في منطقتي"]):
-            return (
-                "نخدم عدة مناطق داخل دولة الإمارات مع استلام وتوصيل مجاني في المناطق المشمولة.\n"
-                "الأفضل ترسل موقعك أو منطقتك على الواتساب 056 211 1334 عشان نأكد لك الخدمة."
-            )
-
-        # Prices
-        if any(p in t for p in ["سعر", "الاسعار", "الأسعار", "كم", "بكم", "تكلفة", "قائمة الاسعار"]):
-            prices = get_prices_from_site()
-            if prices:
-                user_words = [w for w in t.split() if len(w) > 2]
-                matched = []
-                for name_key, val in prices.items():
-                    for uw in user_words:
-                        if uw in name_key:
-                            matched.append((name_key, val))
-                            break
-
-                lines = []
-                if matched:
-                    lines.append("هذه بعض الأسعار التي وجدتها:\n")
-                    for name_key, val in matched[:12]:
-                        lines.append(f"- {name_key.capitalize()}: {val}")
-                else:
-                    lines.append("ما قدرت أجد سعر واضح للقطعة المطلوبة.\n")
-                    lines.append("لكن هذه أمثلة من قائمة الأسعار:\n")
-                    count = 0
-                    for name_key, val in prices.items():
-                        lines.append(f"- {name_key.capitalize()}: {val}")
-                        count += 1
-                        if count >= 8:
-                            break
-
-                lines.append("\nللقائمة الكاملة والمحدّثة يفضل زيارة صفحة الأسعار في الموقع.")
-                lines.append("وتذكّر: على أول 3 طلبات في الشهر يوجد خصم 20% (حسب توفر العرض).")
-                return "\n".join(lines)
-
-            return (
-                "ما قدرت أجيب الأسعار الآن.\n"
-                "يُفضل تشيك صفحة الأسعار في الموقع لأحدث قائمة.\n"
-                "غالباً أسعارنا مناسبة ومع خصم 20% لأول 3 طلبات في الشهر (حسب توفر العرض)."
-            )
-
-        # Pickup / booking
-        if any(p in t for p in ["استلام", "توصيل", "تحجز", "حجز", "طلب", "أطلب", "اطلب"]):
-            return (
-                "نعم، عندنا استلام وتوصيل مجاني في المناطق المشمولة.\n"
-                "تقدر تسوي طلب غسيل سريع عبر موقع fabrico.ae بالضغط على Quick Order أو Schedule Now.\n"
-                "بعد إنشاء الطلب مندوب فريش تاتش يتواصل معك قبل وقت الاستلام للتأكيد.\n"
-                "وعندك خصم 20% على أول 3 طلبات في الشهر (حسب توفر العرض)."
-            )
-
-        # Working hours
-        if any(p in t for p in ["الوقت", "الدوام", "متى تفتحون", "متى تسكرون", "مواعيد العمل"]):
-            return (
-                "نعمل في أوقات مريحة من الصباح إلى المساء.\n"
-                "للتأكد من مواعيد اليوم بالضبط، يفضل تشيك موقع fabrico.ae أو التواصل معنا على الواتساب."
-            )
-
-        # Location
-        if any(p in t for p in ["موقعكم", "وينكم", "وين موقعكم", "فرع", "المغسلة فين"]):
-            return (
-                "نحن في دولة الإمارات ونقدم خدمة الاستلام والتوصيل في مناطق محددة.\n"
-                "تقدر تشيك موقع fabrico.ae أو تراسلنا على الواتساب للتأكد إذا نغطي منطقتك."
-            )
+    # English small talk
+    if t in _EN_GREETINGS:
+        return _EN_GREETING_REPLY
 
-        return None
+    for intent, pattern in _SMALL_TALK_PATTERNS["en"].items():
+        if pattern.search(t):
+            return _SMALL_TALK_REPLIES["en"][intent]
+
+    return None
 
-    # ========== English branch ==========
 
-    # ✅ VIEW ORDER / TRACK ORDER
-    if any(
-        p in t
-        for p in [
+# FAQ trigger phrases per language, in the order the branches are checked.
+_FAQ_TRIGGERS = {
+    "ar": {
+        "complaint": ["ما تجاوب", "ما ترد", "بطيء", "بطيئ", "بطئ"],
+        "view_order": [
+            "اشوف طلبي",
+            "اشوف الطلب",
+            "طلباتي",
+            "اتابع طلبي",
+            "أتتبع طلبي",
+            "تتبع الطلب",
+            "حالة الطلب",
+        ],
+        "payment": [
+            "كيف ادفع",
+            "طريقة الدفع",
+            "الدفع",
+            "ادفع",
+            "سداد",
+            "فاتورة",
+            "الفاتورة",
+            "اسدد",
+        ],
+        "otp": [
+            "تسجيل الدخول",
+            "تسجيل دخول",
+            "كيف ادخل",
+            "كيف أسجل",
+            "الدخول",
+            "otp",
+            "رمز",
+            "رمز تحقق",
+            "رمز التحقق",
+            "دخول بالحساب",
+            "حسابي",
+        ],
+        "services": ["ما هي خدماتكم", "ايش الخدمات", "شو الخدمات", "ما الخدمات", "وش تقدمون"],
+        "offers": ["عرض", "العرض", "العروض", "خصم", "تخفيض"],
+        "contact": ["واتساب", "الواتساب", "رقمك", "رقمكم", "رقم الهاتف", "رقم الجوال", "اتصال"],
+        "area": ["منطقتي", "في منطقتي", "تخدمون منطقتي", "تخدمون في منطقتي"],
+        "prices": ["سعر", "الاسعار", "كم", "بكم", "تكلفة", "قائمة الاسعار"],
+        "pickup": ["استلام", "توصيل", "تحجز", "حجز", "طلب", "اطلب"],
+        "hours": ["الوقت", "الدوام", "متى تفتحون", "متى تسكرون", "مواعيد العمل"],
+        "location": ["موقعكم", "وينكم", "وين موقعكم", "فرع", "المغسلة فين"],
+    },
+    "en": {
+        "complaint": ["not answering", "not ansering", "answer my question", "very slow", "too slow"],
+        "view_order": [
             "view my order",
             "see my order",
             "view order",
@@ -392,9 +411,154 @@ def faq_answer(text: str, lang: str):
             "track my order",
             "track order",
             "order status",
-        ]
-    ):
-        return (
+        ],
+        "payment": [
+            "how to pay",
+            "pay my order",
+            "make payment",
+            "payment",
+            "pay now",
+            "pay bill",
+            "pay invoice",
+            "settle bill",
+            "settle my bill",
+        ],
+        "otp": [
+            "login",
+            "log in",
+            "login with otp",
+            "otp login",
+            "how to login",
+            "how to log in",
+            "sign in",
+            "sign-in",
+            "my account",
+            "account",
+        ],
+        "services": ["services do you offer", "what services", "what do you offer"],
+        "offers": ["offer", "offers", "discount", "promo", "promotion", "deal"],
+        "contact": [
+            "whatsapp",
+            "whats app",
+            "what'sapp",
+            "whatsap",
+            "contact number",
+            "phone number",
+            "mobile number",
+            "call you",
+            "call u",
+            "your number",
+        ],
+        "area": [
+            "service in my area",
+            "serve my area",
+            "do you service in my area",
+            "in my area",
+            "my area",
+            "my location",
+            "from my location",
+        ],
+        "prices": ["price", "prices", "cost", "how much", "rate", "list"],
+        "pickup": ["pickup", "pick up", "delivery", "drop", "collect", "book", "order"],
+        "hours": ["timing", "time", "open", "close", "working hours"],
+        "location": ["where are you", "location", "branch", "shop"],
+    },
+}
+
+# Each group is one precompiled alternation, so a single regex scan replaces
+# one substring test per phrase; it matches exactly when `any(p in t ...)` did.
+_FAQ_PATTERNS = {
+    lang: {intent: _compile_phrases(map(_normalize_arabic, phrases)) for intent, phrases in triggers.items()}
+    for lang, triggers in _FAQ_TRIGGERS.items()
+}
+
+
+# Reply per FAQ intent. "prices" maps to _PRICE_QUERY: that reply is built
+# from the live price list outside the cache.
+_FAQ_REPLIES = {
+    "ar": {
+        "complaint": (
+            "آسف إذا حسّيت أني ما جاوبتك صح أو أن الرد كان بطيء.\n"
+            "حاول تكتب سؤالك مرة ثانية عن الغسيل أو الأسعار أو التوصيل، وأنا أجاوبك بأوضح شكل ممكن. 🌸"
+        ),
+        "view_order": (
+            "عشان تشوف طلبك وتتابع حالته:\n\n"
+            "1. افتح موقع fabrico.ae\n"
+            "2. اضغط على «تسجيل الدخول برمز OTP»\n"
+            "3. حط رقم جوالك، وادخل رمز التحقق اللي يوصلك برسالة SMS\n"
+            "4. بعد تسجيل الدخول، ادخل على قائمة «طلباتي» My Orders\n"
+            "5. اختر الطلب اللي تبيه\n\n"
+            "بتشوف هناك:\n"
+            "- حالة الطلب خطوة بخطوة\n"
+            "- وقت الاستلام والتسليم المتوقع\n"
+            "- حالة الدفع (مدفوع / غير مدفوع)\n"
+            "- تفاصيل المبلغ والملابس.\n"
+        ),
+        "payment": (
+            "عشان تدفع فاتورة الغسيل أونلاين:\n\n"
+            "1. افتح موقع fabrico.ae\n"
+            "2. سجّل دخول برقم جوالك باستخدام «تسجيل الدخول برمز OTP»\n"
+            "3. ادخل على قسم «طلباتي» My Orders\n"
+            "4. اختر الطلب اللي عليه مبلغ مستحق\n"
+            "5. اضغط زر «الدفع» Pay\n"
+            "6. اختر طريقة الدفع المناسبة:\n"
+            "   - بطاقة بنكية (Debit / Credit Card)\n"
+            "   - Apple Pay\n"
+            "   - Google Pay\n"
+            "7. بعد الدفع، تقدر تشوف تأكيد الدفع وتحمل الفاتورة.\n\n"
+            "لو واجهتك أي مشكلة في الدفع، تقدر تتواصل معنا على الواتساب 056 211 1334. 😊"
+        ),
+        "otp": (
+            "طريقة تسجيل الدخول باستخدام رمز OTP سهلة جداً!\n\n"
+            "1. افتح موقع fabrico.ae\n"
+            "2. اضغط على خيار «تسجيل الدخول برمز OTP»\n"
+            "3. اكتب رقم جوالك\n"
+            "4. بيصلك رمز تحقق مكوّن من 6 أرقام في رسالة SMS\n"
+            "5. أدخل الرمز وبيتم تسجيل دخولك فوراً\n\n"
+            "بعدها تقدر:\n"
+            "- تشوف كل طلباتك السابقة والجديدة\n"
+            "- تتابع حالة الطلب خطوة بخطوة\n"
+            "- تعرف حالة الدفع\n"
+            "- تدفع بالبطاقة أو Apple Pay أو Google Pay\n"
+            "- تحمّل الفاتورة والإيصال\n\n"
+            "ما تحتاج كلمة سر — فقط رمز OTP السريع. 😊"
+        ),
+        "services": (
+            "نقدم غسيل، تنظيف جاف، كي، عبايات، كنادير، فساتين، بدلات، ملابس أطفال، "
+            "ستائر، سجاد، لحف، بطانيات، مناشف ومفارش سرير وأكثر.\n"
+            "تقدر تحجز طلب سريع عن طريق موقع fabrico.ae، ومندوبنا يتواصل معك قبل الاستلام للتأكيد."
+        ),
+        "offers": (
+            "حالياً نقدم خصم 20% على أول 3 طلبات في الشهر (حسب توفر العرض).\n"
+            "الخصم يطبق على قيمة الغسيل عند الدفع، سواء بالبطاقة أو Apple Pay أو Google Pay."
+        ),
+        "contact": "تقدر تتواصل معنا على الواتساب أو الاتصال على: 📞 056 211 1334",
+        "area": (
+            "نخدم عدة مناطق داخل دولة الإمارات مع استلام وتوصيل مجاني في المناطق المشمولة.\n"
+            "الأفضل ترسل موقعك أو منطقتك على الواتساب 056 211 1334 عشان نأكد لك الخدمة."
+        ),
+        "prices": _PRICE_QUERY,
+        "pickup": (
+            "نعم، عندنا استلام وتوصيل مجاني في المناطق المشمولة.\n"
+            "تقدر تسوي طلب غسيل سريع عبر موقع fabrico.ae بالضغط على Quick Order أو Schedule Now.\n"
+            "بعد إنشاء الطلب مندوب فريش تاتش يتواصل معك قبل وقت الاستلام للتأكيد.\n"
+            "وعندك خصم 20% على أول 3 طلبات في الشهر (حسب توفر العرض)."
+        ),
+        "hours": (
+            "نعمل في أوقات مريحة من الصباح إلى المساء.\n"
+            "للتأكد من مواعيد اليوم بالضبط، يفضل تشيك موقع fabrico.ae أو التواصل معنا على الواتساب."
+        ),
+        "location": (
+            "نحن في دولة الإمارات ونقدم خدمة الاستلام والتوصيل في مناطق محددة.\n"
+            "تقدر تشيك موقع fabrico.ae أو تراسلنا على الواتساب للتأكد إذا نغطي منطقتك."
+        ),
+    },
+    "en": {
+        "complaint": (
+            "Sorry if it felt like I wasn’t answering you properly or was a bit slow.\n"
+            "Please ask again about laundry, prices, pickup or offers and I’ll try to answer more clearly. 😊"
+        ),
+        "view_order": (
             "To view and track your order:\n\n"
             "1. Go to fabrico.ae\n"
             "2. Tap 'Login with OTP'\n"
@@ -406,24 +570,8 @@ def faq_answer(text: str, lang: str):
             "- Pickup and delivery details\n"
             "- Payment status (paid / unpaid)\n"
             "- The bill and garment details.\n"
-        )
-
-    # ✅ PAYMENT / HOW TO PAY
-    if any(
-        p in t
-        for p in [
-            "how to pay",
-            "pay my order",
-            "make payment",
-            "payment",
-            "pay now",
-            "pay bill",
-            "pay invoice",
-            "settle bill",
-            "settle my bill",
-        ]
-    ):
-        return (
+        ),
+        "payment": (
             "To pay for your laundry order online:\n\n"
             "1. Go to fabrico.ae\n"
             "2. Log in using 'Login with OTP' (mobile number + 6-digit OTP)\n"
@@ -436,25 +584,8 @@ def faq_answer(text: str, lang: str):
             "   - Google Pay\n"
             "7. After payment, you will see confirmation and can download your receipt.\n\n"
             "If you face any issue with payment, you can also WhatsApp us on 056 211 1334. 😊"
-        )
-
-    # ✅ OTP LOGIN / ACCOUNT / TRACK (generic)
-    if any(
-        p in t
-        for p in [
-            "login",
-            "log in",
-            "login with otp",
-            "otp login",
-            "how to login",
-            "how to log in",
-            "sign in",
-            "sign-in",
-            "my account",
-            "account",
-        ]
-    ):
-        return (
+        ),
+        "otp": (
             "It's very simple to log in using OTP on Fresh Touch Laundry:\n\n"
             "1. Go to fabrico.ae\n"
             "2. Tap 'Login with OTP'\n"
@@ -468,153 +599,272 @@ def faq_answer(text: str, lang: str):
             "- Pay using card, Apple Pay or Google Pay\n"
             "- Download your receipts\n\n"
             "No password is needed — just quick OTP login. 😊"
-        )
-
-    # Services
-    if any(p in t for p in ["services do you offer", "what services", "what do you offer"]):
-        return (
+        ),
+        "services": (
             "We handle everyday laundry, dry cleaning, ironing, abayas, kanduras, dresses, suits, "
             "children’s clothes, curtains, carpets, duvets, blankets, towels, bedsheets and more.\n"
             "You can place a Quick Order on fabrico.ae and our rider will contact you before pickup."
-        )
-
-    # Offers / discounts
-    if any(p in t for p in ["offer", "offers", "discount", "promo", "promotion", "deal"]):
-        return (
+        ),
+        "offers": (
             "We currently offer 20% off on the first 3 orders in a month (subject to current offer).\n"
             "The discount applies on your laundry bill when you pay – by card, Apple Pay or Google Pay."
-        )
-
-    # WhatsApp / contact
-    if any(
-        p in t
-        for p in [
-            "whatsapp",
-            "whats app",
-            "what'sapp",
-            "whatsap",
-            "contact number",
-            "phone number",
-            "mobile number",
-            "call you",
-            "call u",
-            "your number",
-        ]
-    ):
-        return "You can WhatsApp or call us on:\n📞 056 211 1334"
-
-    # Area coverage / service in my area
-    if any(
-        p in t
-        for p in [
-            "service in my area",
-            "serve my area",
-            "do you service in my area",
-            "in my area",
-            "my area",
-            "my location",
-            "from my location",
-        ]
-    ):
-        return (
+        ),
+        "contact": "You can WhatsApp or call us on:\n📞 056 211 1334",
+        "area": (
             "We provide pickup & delivery in selected areas within the UAE.\n"
             "To confirm for your exact location, please share your area or live location on WhatsApp "
             "to 056 211 1334, or check details on fabrico.ae."
-        )
-
-    # Prices
-    if any(p in t for p in ["price", "prices", "cost", "how much", "rate", "list"]):
-        prices = get_prices_from_site()
-        if prices:
-            user_words = [w for w in t.split() if len(w) > 2]
-            matched = []
-            for name_key, val in prices.items():
-                for uw in user_words:
-                    if uw in name_key:
-                        matched.append((name_key, val))
-                        break
-
-            lines = []
-            if matched:
-                lines.append("Here are the prices I found:\n")
-                for name_key, val in matched[:12]:
-                    lines.append(f"- {name_key.capitalize()}: {val}")
-            else:
-                lines.append(
-                    "I couldn't find an exact price match for that item.\nHere are some example prices:\n"
-                )
-                count = 0
-                for name_key, val in prices.items():
-                    lines.append(f"- {name_key.capitalize()}: {val}")
-                    count += 1
-                    if count >= 8:
-                        break
-
-            lines.append(
-                "\nFor the full updated price list, please check the pricing page on the website."
-            )
-            lines.append(
-                "And remember: on the first 3 orders in a month, we offer 20% off (subject to current offer)."
-            )
-            return "\n".join(lines)
-
-        return (
-            "I couldn't fetch the live prices right now.\n"
-            "Please check the pricing page on the website for the latest detailed price list.\n"
-            "We usually offer very affordable rates, and for the first 3 orders in a month "
-            "we give 20% off (subject to current offer)."
-        )
-
-    # Pickup / booking
-    if any(p in t for p in ["pickup", "pick up", "delivery", "drop", "collect", "book", "order"]):
-        return (
+        ),
+        "prices": _PRICE_QUERY,
+        "pickup": (
             "Yes, we provide free pickup and drop in our covered areas.\n"
             "You can create a quick laundry order by visiting fabrico.ae and tapping on "
             "Quick Order / Schedule Now.\n"
             "After you place the order, our rider will contact you before your pickup time "
             "to reconfirm the details.\n"
             "Also, for the first 3 orders in a month, you get 20% off (subject to current offer)."
-        )
-
-    # Working hours
-    if any(p in t for p in ["timing", "time", "open", "close", "working hours"]):
-        return (
+        ),
+        "hours": (
             "We operate with convenient timings from morning till evening.\n"
             "For today's exact opening hours, please check fabrico.ae or contact us on WhatsApp."
-        )
-
-    # Location
-    if any(p in t for p in ["where are you", "location", "branch", "shop"]):
-        return (
+        ),
+        "location": (
             "We are based in the UAE and provide pickup & delivery service in our covered areas.\n"
             "Please check fabrico.ae or contact us on WhatsApp to confirm coverage for your area."
-        )
+        ),
+    },
+}
+
+
+# Fixed parts of the price reply; only the item lines are built per request.
+_PRICE_TEXT = {
+    "ar": {
+        "found": "هذه بعض الأسعار التي وجدتها:\n",
+        "examples": "ما قدرت أجد سعر واضح للقطعة المطلوبة.\n\nلكن هذه أمثلة من قائمة الأسعار:\n",
+        "footer": (
+            "\nللقائمة الكاملة والمحدّثة يفضل زيارة صفحة الأسعار في الموقع.\n"
+            "وتذكّر: على أول 3 طلبات في الشهر يوجد خصم 20% (حسب توفر العرض)."
+        ),
+        "unavailable": (
+            "ما قدرت أجيب الأسعار الآن.\n"
+            "يُفضل تشيك صفحة الأسعار في الموقع لأحدث قائمة.\n"
+            "غالباً أسعارنا مناسبة ومع خصم 20% لأول 3 طلبات في الشهر (حسب توفر العرض)."
+        ),
+    },
+    "en": {
+        "found": "Here are the prices I found:\n",
+        "examples": "I couldn't find an exact price match for that item.\nHere are some example prices:\n",
+        "footer": (
+            "\nFor the full updated price list, please check the pricing page on the website.\n"
+            "And remember: on the first 3 orders in a month, we offer 20% off (subject to current offer)."
+        ),
+        "unavailable": (
+            "I couldn't fetch the live prices right now.\n"
+            "Please check the pricing page on the website for the latest detailed price list.\n"
+            "We usually offer very affordable rates, and for the first 3 orders in a month "
+            "we give 20% off (subject to current offer)."
+        ),
+    },
+}
+
+
+def _price_index(prices):
+    """(names, rendered rows, trigram -> positions, examples reply per lang), rebuilt once per price list."""
+    if _PRICE_INDEX["prices"] is not prices:
+        names = list(prices)
+        rows = [f"- {name_key.capitalize()}: {val}" for name_key, val in prices.items()]
+        grams = defaultdict(set)
+        for pos, name_key in enumerate(names):
+            for i in range(len(name_key) - 2):
+                grams[name_key[i : i + 3]].add(pos)
+        # The no-match reply doesn't depend on the question, only on the list.
+        examples = {lang: _render_prices(text["examples"], rows[:8], lang) for lang, text in _PRICE_TEXT.items()}
+        _PRICE_INDEX.update(prices=prices, index=(names, rows, dict(grams), examples))
+    return _PRICE_INDEX["index"]
+
+
+def _render_prices(header, lines, lang):
+    """Header, item lines and the language's footer as one reply."""
+    body = "\n".join(lines)
+    return f"{header}\n{body}\n{_PRICE_TEXT[lang]['footer']}"
+
+
+def _match_prices(prices, user_words):
+    """Positions of price names containing any user word, in price-list order."""
+    names, _, grams, _ = _price_index(prices)
+    hits = set()
+    for uw in user_words:
+        # Only names sharing every trigram of the word can contain it; confirm with `in`.
+        postings = [grams.get(uw[i : i + 3]) for i in range(len(uw) - 2)]
+        if not all(postings):
+            continue
+        candidates = set.intersection(*postings)
+        hits.update(pos for pos in candidates if uw in names[pos])
+    return sorted(hits)
+
+
+def price_answer(t: str, lang: str) -> str:
+    """Price reply built from the live price list, bilingual. `t` is already stripped and lowercased."""
+    text = _PRICE_TEXT[lang]
+    prices = get_prices_from_site()
+    if not prices:
+        return text["unavailable"]
+
+    # A set: repeated words ("abaya abaya price") are looked up once.
+    user_words = {w for w in t.split() if len(w) > 2}
+    matched = _match_prices(prices, user_words)
+
+    # Rows are rendered once per price list; a reply only picks and joins them.
+    _, rows, _, examples = _price_index(prices)
+    if not matched:
+        return examples[lang]
+    return _render_prices(text["found"], [rows[pos] for pos in matched[:12]], lang)
+
+
+# Common items for price detection: a bare item name is treated as a price question.
+_COMMON_ITEMS = frozenset(
+    {
+        "abaya",
+        "shela",
+        "sheila",
+        "jalabiya",
+        "kandoora",
+        "kandura",
+        "thobe",
+        "dress",
+        "blanket",
+        "duvet",
+        "curtain",
+        "curtains",
+        "carpet",
+        "t-shirt",
+        "shirt",
+        "trouser",
+        "pants",
+        "jeans",
+        "bedsheet",
+        "bed sheet",
+        "bedcover",
+        "bed cover",
+        "apron",
+        "cap",
+        "lungi",
+        "wizar",
+        "wizaar",
+    }
+)
+
+
+def faq_answer(text: str, lang: str):
+    """Main FAQ / business logic, bilingual."""
+    t = text.strip().lower()
+    # If user wrote just "abaya" → treat as price query
+    if t in _COMMON_ITEMS:
+        t = "price " + t
+    reply = _match_faq(_normalize_arabic(t) if lang == "ar" else t, lang)
+    if reply is _PRICE_QUERY:
+        return price_answer(t, lang)
+    return reply
+
+
+def _match_faq(t: str, lang: str):
+    """FAQ matching on already-normalized text, without network access. Price questions return _PRICE_QUERY."""
+    # First matching intent wins; _FAQ_PATTERNS is in priority order.
+    for intent, pattern in _FAQ_PATTERNS[lang].items():
+        if pattern.search(t):
+            return _FAQ_REPLIES[lang][intent]
 
     return None
 
 
+# Kept out of fuzzy routing: triggers that are themselves misspellings (a near miss
+# of a typo is usually another word: "whatsup" ~ "whatsap"), and phrases one swap
+# away from everyday chat ("how are you" ~ "who are you").
+_FUZZY_EXCLUDED = frozenset({"whatsap", "what'sapp", "not ansering", "who are you"})
+
+# Every greeting and trigger phrase per language, for routing messages that miss
+# all keywords only because of a typo.
+_FUZZY_PHRASES = {
+    lang: sorted(
+        {
+            *(_AR_GREETINGS if lang == "ar" else _EN_GREETINGS),
+            *(_normalize_arabic(p) for phrases in _SMALL_TALK_TRIGGERS[lang].values() for p in phrases),
+            *(_normalize_arabic(p) for phrases in _FAQ_TRIGGERS[lang].values() for p in phrases),
+        }
+        - _FUZZY_EXCLUDED
+    )
+    for lang in ("ar", "en")
+}
+
+
+_FUZZY_MIN_CHARS = 5
+
+
+_FALLBACK_REPLIES = {
+    "ar": (
+        "أعتذر، يمكن سؤالك عام شوي أو خارج نطاق المعلومات اللي عندي.\n"
+        "أنا مساعد متخصص في الغسيل، الأسعار، العروض وخدمة الاستلام والتوصيل.\n"
+        "حاول تسألني عن شيء بخصوص الغسيل أو الأسعار أو الطلبات وسأحاول أساعدك بأفضل شكل. 🌸"
+    ),
+    "en": (
+        "I’m mainly trained to help with laundry topics – prices, pickup, offers, "
+        "and how to place an order or pay for your order on fabrico.ae.\n"
+        "Please ask me about your laundry, items, prices, orders or pickup and I’ll do my best to help. 😊"
+    ),
+}
+
+
 def answer(user_text: str) -> str:
     """Main entrypoint: decide language, small talk, FAQ, or fallback."""
-    lang = detect_language(user_text)
+    # Normalize once; every matcher below works on this lowercased text.
+    text = user_text.strip().lower()
+
+    precanned = _PRECANNED.get(text)
+    if precanned:
+        return precanned
+
+    # A bare item name ("abaya") is always a price question; skip intent matching.
+    if text in _COMMON_ITEMS:
+        return price_answer("price " + text, "en")
+
+    # Only short messages are cached; the endpoint accepts text of any length.
+    if len(text) <= _CACHE_MAX_CHARS:
+        lang, reply = _canned_answer(text)
+    else:
+        lang, reply = _match_message(text)
+    if reply is _PRICE_QUERY:
+        return price_answer(text, lang)
+    return reply
+
+
+@lru_cache(maxsize=4096)
+def _canned_answer(text: str):
+    """_match_message cached per normalized message."""
+    return _match_message(text)
 
-    small = handle_small_talk_and_meta(user_text, lang)
+
+def _match_message(text: str):
+    """Everything except live prices. Returns (lang, reply)."""
+    lang = detect_language(text)
+    if lang == "ar":
+        text = _normalize_arabic(text)
+
+    small = _match_small_talk(text, lang)
     if small:
-        return small
+        return lang, small
 
-    faq = faq_answer(user_text, lang)
+    faq = _match_faq(text, lang)
     if faq:
-        return faq
+        return lang, faq
+
+    # Near-miss typos ("paymnet", "discont", "delivry"): answer as the closest trigger phrase.
+    # Shorter text is skipped: at this cutoff "rat" or "boo" would pass as "rate" or "book".
+    if len(text) >= _FUZZY_MIN_CHARS:
+        close = difflib.get_close_matches(text, _FUZZY_PHRASES[lang], n=1, cutoff=0.85)
+        if close:
+            reply = _match_small_talk(close[0], lang) or _match_faq(close[0], lang)
+            if reply:
+                return lang, reply
 
     # Fallback if nothing matched
-    if lang == "ar":
-        return (
-            "أعتذر، يمكن سؤالك عام شوي أو خارج نطاق المعلومات اللي عندي.\n"
-            "أنا مساعد متخصص في الغسيل، الأسعار، العروض وخدمة الاستلام والتوصيل.\n"
-            "حاول تسألني عن شيء بخصوص الغسيل أو الأسعار أو الطلبات وسأحاول أساعدك بأفضل شكل. 🌸"
-        )
-    else:
-        return (
-            "I’m mainly trained to help with laundry topics – prices, pickup, offers, "
-            "and how to place an order or pay for your order on fabrico.ae.\n"
-            "Please ask me about your laundry, items, prices, orders or pickup and I’ll do my best to help. 😊"
-        )
+    return lang, _FALLBACK_REPLIES[lang]